@@ -25,17 +25,22 @@
 import curses
 import subprocess
 import os
+import selectors
 import sys
-import textwrap
 import time
-import fcntl
+from collections import OrderedDict, deque
 from enum import Enum
 from datetime import datetime
+from pathlib import Path
 
 # --- Configuration ---
 MASTER_LIST = "installed_packages.list"
 SUCCESS_LOG = "installed_successfully.list"
 FAILURE_LOG = "failed.list"
+BATCH_SIZE = 50
+WRAP_CACHE_SIZE = 10000
+PIPE_DRAIN_READS = 16  # 64 KiB reads taken from a finished apt run's pipe, at most
+MIN_HEIGHT, MIN_WIDTH = 12, 62  # smallest terminal the panes and overlays fit in
 
 class Status(Enum):
     QUEUED = 1
@@ -47,6 +52,16 @@ class Status(Enum):
 # --- Curses Color Pair Definitions ---
 COLOR_DEFAULT, COLOR_PROCESSING, COLOR_SUCCESS, COLOR_FAILURE, COLOR_SKIPPED, COLOR_BORDER, COLOR_ACCENT = 1, 2, 3, 4, 5, 6, 7
 
+STATUS_SYMBOL = {
+    Status.QUEUED: "  ",
+    Status.PROCESSING: "->",
+    Status.SUCCESS: " ✔",
+    Status.FAILURE: " ✖",
+    Status.SKIPPED: " S"
+}
+# Curses attributes per status, indexed by Status.value; filled in by setup_colors().
+STATUS_ATTR = [0] * (len(Status) + 1)
+
 def setup_colors():
     """Initializes color pairs for the UI."""
     curses.start_color()
@@ -58,42 +73,108 @@ def setup_colors():
     curses.init_pair(COLOR_SKIPPED, curses.COLOR_CYAN, -1)
     curses.init_pair(COLOR_BORDER, curses.COLOR_WHITE, -1)
     curses.init_pair(COLOR_ACCENT, curses.COLOR_GREEN, -1)
+    STATUS_ATTR[Status.QUEUED.value] = curses.color_pair(COLOR_DEFAULT)
+    STATUS_ATTR[Status.PROCESSING.value] = curses.color_pair(COLOR_PROCESSING) | curses.A_BOLD
+    STATUS_ATTR[Status.SUCCESS.value] = curses.color_pair(COLOR_SUCCESS)
+    STATUS_ATTR[Status.FAILURE.value] = curses.color_pair(COLOR_FAILURE)
+    STATUS_ATTR[Status.SKIPPED.value] = curses.color_pair(COLOR_SKIPPED)
 
 class Package:
     """A simple class to hold package state."""
-    def __init__(self, line):
+    __slots__ = ('line', 'name', 'status')
+
+    def __init__(self, line, status=Status.QUEUED):
         self.line = line.strip()
         self.name = self.line.split()[0] if self.line else ""
-        self.status = Status.QUEUED
+        self.status = status
 
-def check_if_installed(package_name):
-    """Uses dpkg-query to check if a package is already installed."""
+def load_installed_set():
+    """Queries dpkg once for every package currently installed on the system."""
     try:
-        subprocess.run(
-            ['dpkg-query', '-W', '-f=${Status}', package_name],
-            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        result = subprocess.run(
+            ['dpkg-query', '-W', '-f=${db:Status-Abbrev} ${Package} ${binary:Package}\n'],
+            capture_output=True, text=True
         )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+    except FileNotFoundError:
+        return frozenset()
+    installed = set()
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        # The first flag is the desired action (install/hold/remove/purge); only the second,
+        # the current state, says whether the package is installed.
+        # Keep both the bare and the arch-qualified name so list entries like "foo:i386" match.
+        if fields and len(fields[0]) > 1 and fields[0][1] == 'i': installed.update(fields[1:])
+    return frozenset(installed)
 
 def get_initial_packages():
     """Loads packages and sets initial status from log files."""
     if not os.path.exists(MASTER_LIST): return []
-    open(SUCCESS_LOG, 'a').close()
-    open(FAILURE_LOG, 'a').close()
-    with open(SUCCESS_LOG) as f: success_lines = {line.strip() for line in f}
-    with open(FAILURE_LOG) as f: failure_lines = {line.strip() for line in f}
-    packages = []
-    with open(MASTER_LIST) as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'): continue
-            p = Package(line)
-            if p.line in success_lines: p.status = Status.SUCCESS
-            elif p.line in failure_lines: p.status = Status.FAILURE
-            packages.append(p)
-    return packages
+    success_lines = set(Path(SUCCESS_LOG).read_text().splitlines()) if os.path.exists(SUCCESS_LOG) else set()
+    failure_lines = set(Path(FAILURE_LOG).read_text().splitlines()) if os.path.exists(FAILURE_LOG) else set()
+    # A success entry wins if a package appears in both logs.
+    initial_status = {line: Status.FAILURE for line in failure_lines}
+    initial_status.update({line: Status.SUCCESS for line in success_lines})
+    lines = [line.strip() for line in Path(MASTER_LIST).read_text().splitlines()]
+    return [Package(line, initial_status.get(line, Status.QUEUED)) for line in lines if line and not line.startswith('#')]
+
+# apt/dpkg lines that report the outcome of a single package within a batch. They are
+# matched with plain string checks, since every line of a batch's output is scanned.
+APT_SUCCESS_PREFIX = "Setting up "
+APT_FAILURE_PREFIXES = ("E: Unable to locate package ", "dpkg: error processing package ")
+APT_NO_CANDIDATE = ("E: Package '", "' has no installation candidate")
+
+def parse_apt_line(line, by_name):
+    """Returns (index, succeeded) if an apt output line reports on a package in the batch."""
+    if line.startswith(APT_SUCCESS_PREFIX):
+        rest, succeeded = line[len(APT_SUCCESS_PREFIX):], True
+    elif line.startswith(APT_FAILURE_PREFIXES):
+        rest, succeeded = line.partition(" package ")[2], False
+    elif line.startswith(APT_NO_CANDIDATE[0]) and line.endswith(APT_NO_CANDIDATE[1]):
+        rest, succeeded = line[len(APT_NO_CANDIDATE[0]):-len(APT_NO_CANDIDATE[1])], False
+    else:
+        return None
+    # apt may print native packages with an ":arch" suffix the list entry doesn't have.
+    name = rest.split(' ', 1)[0]
+    index = by_name.get(name, by_name.get(name.split(':')[0]))
+    return None if index is None else (index, succeeded)
+
+def set_status(pkg, status, counters):
+    """Moves a package to a new status and keeps the per-status counters in step."""
+    counters[pkg.status] -= 1
+    counters[status] += 1
+    pkg.status = status
+
+_WRAP_WHITESPACE = str.maketrans('\v\f', '  ')
+
+def slice_wrap(line, width):
+    """Splits a line into fixed-width chunks; blank lines produce no chunks."""
+    # apt output is mechanical (paths, URLs, progress), so word-aware wrapping buys nothing.
+    # dpkg progress redraws itself with \r; keep what a terminal would end up showing, and
+    # blank out other whitespace controls that curses would act on.
+    line = line.rstrip('\r').rpartition('\r')[2].translate(_WRAP_WHITESPACE).expandtabs()
+    return [line[i:i + width] for i in range(0, len(line), width)]
+
+_wrap_cache = OrderedDict()
+
+def wrap_cached(line, width):
+    """Wraps a line to width, memoizing results in a bounded LRU cache."""
+    key = (line, width)
+    wrapped = _wrap_cache.get(key)
+    if wrapped is None:
+        wrapped = tuple(slice_wrap(line, width))
+        _wrap_cache[key] = wrapped
+        if len(_wrap_cache) > WRAP_CACHE_SIZE: _wrap_cache.popitem(last=False)
+    else:
+        _wrap_cache.move_to_end(key)
+    return wrapped
+
+def append_wrapped(line_buffer, lines, width):
+    """Extends line_buffer with the wrapped form of lines; returns True if anything was added."""
+    added = False
+    for line in lines:
+        wrapped = wrap_cached(line, width)
+        if wrapped: line_buffer.extend(wrapped); added = True
+    return added
 
 def format_seconds(seconds):
     """Formats seconds into MM:SS."""
@@ -101,27 +182,32 @@ def format_seconds(seconds):
     minutes, seconds = divmod(int(seconds), 60)
     return f"{minutes:02d}:{seconds:02d}"
 
-def draw_package_list(pane, packages, scroll_offset):
+def create_windows(height, width):
+    """Lays out the panes and overlays for the given terminal size."""
+    split_pos = width // 2
+    left_pane = curses.newwin(height, split_pos, 0, 0)
+    # Size the pad for the output we actually keep rather than a fixed worst case.
+    pad_lines = max(2000, height * 20)
+    right_pad = curses.newpad(pad_lines, split_pos - 2)
+    wrap_width = width - split_pos - 4
+    if wrap_width <= 0: wrap_width = 10
+    stats_win = curses.newwin(9, 30, 1, width - 31)
+    help_win = curses.newwin(12, 30, (height-12)//2, (width-30)//2)
+    return split_pos, pad_lines, wrap_width, left_pane, right_pad, stats_win, help_win
+
+def draw_package_list(pane, packages, scroll_offset, height, width):
     """Draws the list of packages and a scrollbar."""
     pane.erase()
     pane.box()
     pane.addstr(0, 2, " Packages (↑/↓ PgUp/PgDn) ", curses.A_BOLD)
-    height, width = pane.getmaxyx()
     max_lines = height - 2
     visible_packages = packages[scroll_offset : scroll_offset + max_lines]
 
-    symbols = {
-        Status.QUEUED: ("  ", COLOR_DEFAULT),
-        Status.PROCESSING: ("->", COLOR_PROCESSING | curses.A_BOLD),
-        Status.SUCCESS: (" ✔", COLOR_SUCCESS),
-        Status.FAILURE: (" ✖", COLOR_FAILURE),
-        Status.SKIPPED: (" S", COLOR_SKIPPED)
-    }
-
-    for i, pkg in enumerate(visible_packages):
-        symbol, color_attr = symbols[pkg.status]
-        display_line = f"{symbol} {pkg.line}"
-        pane.addstr(i + 1, 2, display_line[:width-4], curses.color_pair(color_attr))
+    # Local aliases keep attribute and global lookups out of the per-row loop.
+    addstr, symbols, attrs, text_width = pane.addstr, STATUS_SYMBOL, STATUS_ATTR, width - 4
+    for i, pkg in enumerate(visible_packages, 1):
+        status = pkg.status
+        addstr(i, 2, f"{symbols[status]} {pkg.line}"[:text_width], attrs[status.value])
 
     if len(packages) > max_lines:
         max_scroll = len(packages) - max_lines
@@ -135,9 +221,10 @@ def draw_right_pane(pad, height, width, line_buffer, scroll_pos):
     """Draws the pre-wrapped lines from the line_buffer."""
     pad.erase()
     
+    # line_buffer is capped at the pad height, so every line fits.
+    addstr = pad.addstr
     for i, line in enumerate(line_buffer):
-        if i >= pad.getmaxyx()[0]: break
-        pad.addstr(i, 0, line)
+        addstr(i, 0, line)
     
     pad.noutrefresh(scroll_pos, 0, 1, width // 2 + 1, height - 2, width - 2)
 
@@ -155,6 +242,12 @@ def draw_stats_window(stats):
     win.addstr(7, 2, f"ETR:      {format_seconds(stats['etr'])}")
     win.noutrefresh()
 
+def draw_too_small(stdscr, width):
+    """Replaces the UI with a notice while the terminal is below the minimum size."""
+    stdscr.erase()
+    stdscr.addstr(0, 0, "Terminal too small"[:width - 1])
+    stdscr.refresh()
+
 def draw_help_window(win):
     """Draws the help overlay window."""
     win.erase()
@@ -178,7 +271,7 @@ def draw_help_window(win):
     win.addstr(i + 3, 3, "q - Quit")
     win.noutrefresh()
 
-def main_ui(stdscr):
+def main_ui(stdscr, success_log, failure_log):
     """The main application function."""
     curses.curs_set(0)
     stdscr.nodelay(True)
@@ -186,118 +279,235 @@ def main_ui(stdscr):
 
     packages = get_initial_packages()
     if not packages: return
+    installed_set = load_installed_set()
+    counters = dict.fromkeys(Status, 0)
+    for p in packages: counters[p.status] += 1
 
+    # Geometry is queried once here and again only on KEY_RESIZE. The windows themselves are
+    # built by the redraw step once the terminal is big enough for them.
     height, width = stdscr.getmaxyx()
-    split_pos = width // 2
-    left_pane = curses.newwin(height, split_pos, 0, 0)
-    right_pad = curses.newpad(5000, split_pos - 2)
-    stats_win = curses.newwin(9, 30, 1, width - 31)
-    help_win = curses.newwin(12, 30, (height-12)//2, (width-30)//2)
+    too_small = height < MIN_HEIGHT or width < MIN_WIDTH
+    if too_small: draw_too_small(stdscr, width)
+    needs_layout = True
+    # Placeholders until the first layout replaces them with sizes for the real terminal.
+    pad_lines, wrap_width = 2000, 10
 
     scroll_offset, right_scroll_pos = 0, 0
     show_stats, show_help = True, False
     
-    stats_data = {'total': len(packages), 'processed': 0, 'times': [], 'elapsed': 0, 'etr': None, 'window': stats_win}
+    stats_data = {'total': len(packages), 'processed': 0, 'sum_time': 0.0, 'n_times': 0, 'elapsed': 0, 'etr': None, 'window': None}
     start_time = time.time()
     pkg_start_time = 0
     
     current_index = 0
     process = None
-    output_lines = ["Welcome! Press 'h' for help or 's' to toggle stats."]
-
-    while current_index < len(packages):
-        needs_redraw = False
+    batch, retry = [], deque()
+    output_lines = deque(["Welcome! Press 'h' for help or 's' to toggle stats."], maxlen=pad_lines // 2)
+    # line_buffer is the wrapped view of output_lines, extended as each line arrives.
+    line_buffer = deque(maxlen=pad_lines)
+    # Per-pane damage flags; a pane is only repainted when its own inputs changed.
+    dirty = {'left': True, 'right': True, 'stats': True, 'help': False}
+    last_stats_draw = 0
+
+    sel = selectors.DefaultSelector()
+    sel.register(sys.stdin, selectors.EVENT_READ)
+    # Bound once; these are called on every pass through the loop.
+    select, getch, clock = sel.select, stdscr.getch, time.time
+
+    while current_index < len(packages) or retry or process is not None:
+        # --- Sleep until a key, apt output or the next stats tick ---
+        # With no install running the state machine has work to do, so just poll.
+        ready = {key.fileobj for key, _ in select(timeout=1.0 if process is not None else 0)}
 
         # --- Handle User Input ---
-        key = stdscr.getch()
-        if key == ord('q'): break
-        elif key == ord('h'): show_help = not show_help; needs_redraw = True
-        elif key == ord('s'): show_stats = not show_stats; needs_redraw = True
-        elif key in [curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE]:
-            max_list_lines = height - 2
-            if key == curses.KEY_UP: scroll_offset -= 1
-            elif key == curses.KEY_DOWN: scroll_offset += 1
-            elif key == curses.KEY_PPAGE: scroll_offset -= max_list_lines
-            elif key == curses.KEY_NPAGE: scroll_offset += max_list_lines
-            
-            max_scroll = max(0, len(packages) - max_list_lines)
-            scroll_offset = max(0, min(scroll_offset, max_scroll))
-            needs_redraw = True
+        # getch() runs on every pass, not just when stdin is readable: ncurses reports
+        # KEY_RESIZE from its SIGWINCH handler without any data arriving on stdin.
+        keys = []
+        key = getch()
+        while key != -1: keys.append(key); key = getch()
+        if ord('q') in keys: break
+        for key in keys:
+            if key == ord('h'):
+                show_help = not show_help
+                # Hiding the overlay has to uncover whatever was underneath it.
+                dirty['left'] = dirty['right'] = True
+                dirty['help'] = show_help
+            elif key == ord('s'):
+                show_stats = not show_stats
+                dirty['right'] = True
+                dirty['stats'] = show_stats
+            elif key in [curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE]:
+                max_list_lines = height - 2
+                if key == curses.KEY_UP: scroll_offset -= 1
+                elif key == curses.KEY_DOWN: scroll_offset += 1
+                elif key == curses.KEY_PPAGE: scroll_offset -= max_list_lines
+                elif key == curses.KEY_NPAGE: scroll_offset += max_list_lines
+
+                max_scroll = max(0, len(packages) - max_list_lines)
+                scroll_offset = max(0, min(scroll_offset, max_scroll))
+                dirty['left'] = True
+            elif key == curses.KEY_RESIZE:
+                height, width = stdscr.getmaxyx()
+                # ncurses has already shrunk the screen, so the old windows can't be drawn either.
+                # Pause drawing behind a notice; installs carry on until the terminal grows again.
+                too_small = height < MIN_HEIGHT or width < MIN_WIDTH
+                if too_small: draw_too_small(stdscr, width)
+                needs_layout = True
         
         # --- Main State Machine ---
         if process is None:
-            pkg = packages[current_index]
-            if pkg.status == Status.QUEUED:
-                if check_if_installed(pkg.name):
-                    pkg.status = Status.SKIPPED
-                else:
-                    pkg.status = Status.PROCESSING
-                    output_lines = [f"Running: sudo apt-get install -y {pkg.name}", "-"*40]
-                    cmd = ['sudo', 'apt-get', 'install', '-y', pkg.name]
-                    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace')
-                    pkg_start_time = time.time()
-                    fd = process.stdout.fileno()
-                    fl = fcntl.fcntl(fd, fcntl.F_GETFL)
-                    fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
-            
-            if pkg.status != Status.PROCESSING:
-                current_index += 1
-            needs_redraw = True
+            # Leftovers of failed batches go first; otherwise gather the next batch.
+            if retry:
+                batch = retry.popleft()
+            else:
+                batch = []
+                while current_index < len(packages) and len(batch) < BATCH_SIZE:
+                    pkg = packages[current_index]
+                    if pkg.status == Status.QUEUED:
+                        if pkg.name in installed_set: set_status(pkg, Status.SKIPPED, counters)
+                        else: batch.append(current_index)
+                    current_index += 1
+
+            if batch:
+                names = [packages[i].name for i in batch]
+                for i in batch: set_status(packages[i], Status.PROCESSING, counters)
+                by_name = {packages[i].name: i for i in batch}
+                outcomes = {}
+                output_lines = deque([f"Running: sudo apt-get install -y {' '.join(names)}", "-"*40], maxlen=pad_lines // 2)
+                line_buffer.clear()
+                append_wrapped(line_buffer, output_lines, wrap_width)
+                dirty['right'] = True
+                cmd = ['sudo', 'apt-get', 'install', '-y'] + names
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                pkg_start_time = clock()
+                stdout_buf = bytearray()
+                sel.register(process.stdout, selectors.EVENT_READ)
+            dirty['left'] = True
         else: # A process is running
-            try:
-                for line in iter(process.stdout.readline, ''):
-                    if line: output_lines.append(line.strip()); needs_redraw = True
-            except TypeError: pass
-
-            if process.poll() is not None:
-                pkg = packages[current_index]
-                if process.returncode == 0:
-                    pkg.status = Status.SUCCESS
-                    if pkg_start_time > 0: stats_data['times'].append(time.time() - pkg_start_time)
-                else:
-                    pkg.status = Status.FAILURE
-                
-                process, pkg_start_time = None, 0
-                current_index += 1
-                needs_redraw = True
-                time.sleep(0.5)
+            # Poll on every pass rather than waiting for EOF: a daemon started from a postinst
+            # can inherit apt's stdout and hold the pipe open long after apt has exited.
+            exited = process.poll() is not None
+            if exited and process.stdout not in ready:
+                ready = {key.fileobj for key, _ in select(timeout=0)}
+            eof = False
+            # A live process gets one read per pass; once it has exited, drain what is buffered,
+            # bounded in case something that inherited the pipe keeps writing to it.
+            for _ in range(PIPE_DRAIN_READS if exited else 1):
+                if process.stdout not in ready: break
+                # select() reported data or EOF, so this never blocks.
+                data = os.read(process.stdout.fileno(), 65536)
+                if not data:
+                    eof = True
+                    break
+                stdout_buf += data
+                if exited: ready = {key.fileobj for key, _ in select(timeout=0)}
+            # EOF means every writer closed the pipe, so apt is already on its way out.
+            if eof and not exited: process.wait()
+
+            *complete, stdout_buf = stdout_buf.split(b'\n')
+            new_lines = [line.decode(errors='replace').strip() for line in complete]
+            if process.returncode is not None and stdout_buf:
+                # Keep any unterminated last line.
+                new_lines.append(stdout_buf.decode(errors='replace').strip())
+                stdout_buf = bytearray()
+            if new_lines:
+                for line in new_lines:
+                    outcome = parse_apt_line(line, by_name)
+                    if outcome: outcomes[outcome[0]] = outcome[1]
+                output_lines.extend(new_lines)
+                # Blank lines wrap to nothing and don't need a repaint.
+                if append_wrapped(line_buffer, new_lines, wrap_width): dirty['right'] = True
+
+            if process.returncode is not None:
+                per_pkg_time = (clock() - pkg_start_time) / len(batch)
+                default_ok = True if process.returncode == 0 else None
+                # If apt named the packages that broke the transaction, the rest can go again
+                # together; without a culprit they are retried one at a time.
+                named_failure = False in outcomes.values()
+                leftover = []
+                for i in batch:
+                    pkg = packages[i]
+                    # A zero exit means the whole transaction went through unless apt named a failure.
+                    ok = outcomes.get(i, default_ok)
+                    if ok:
+                        set_status(pkg, Status.SUCCESS, counters)
+                        success_log.write(pkg.line + '\n')
+                        stats_data['sum_time'] += per_pkg_time
+                        stats_data['n_times'] += 1
+                    elif ok is False or len(batch) == 1:
+                        set_status(pkg, Status.FAILURE, counters)
+                        failure_log.write(pkg.line + '\n')
+                    else:
+                        set_status(pkg, Status.QUEUED, counters)
+                        leftover.append(i)
+                if leftover and named_failure: retry.append(leftover)
+                else: retry.extend([i] for i in leftover)
+
+                sel.unregister(process.stdout)
+                process.stdout.close()
+                process, pkg_start_time, batch = None, 0, []
+                dirty['left'] = True
 
         # --- Update stats and redraw ---
-        stats_data['processed'] = sum(1 for p in packages if p.status in [Status.SUCCESS, Status.FAILURE, Status.SKIPPED])
-        stats_data['elapsed'] = time.time() - start_time
-        if stats_data['times']:
-            avg_time = sum(stats_data['times']) / len(stats_data['times'])
-            remaining_to_install = sum(1 for p in packages if p.status == Status.QUEUED)
-            stats_data['etr'] = avg_time * remaining_to_install
+        if needs_layout and not too_small:
+            split_pos, pad_lines, wrap_width, left_pane, right_pad, stats_win, help_win = create_windows(height, width)
+            stats_data['window'] = stats_win
+            output_lines = deque(output_lines, maxlen=pad_lines // 2)
+            line_buffer = deque(maxlen=pad_lines)
+            append_wrapped(line_buffer, output_lines, wrap_width)
+            stdscr.clear()
+            dirty = {'left': True, 'right': True, 'stats': show_stats, 'help': show_help}
+            needs_layout = False
+
+        now = clock()
+        if show_stats and now - last_stats_draw > 1.0: dirty['stats'] = True
+        # Only dirty while the window is shown, so a hidden stats window costs nothing.
+        if dirty['stats']:
+            stats_data['processed'] = counters[Status.SUCCESS] + counters[Status.FAILURE] + counters[Status.SKIPPED]
+            stats_data['elapsed'] = now - start_time
+            if stats_data['n_times']:
+                avg_time = stats_data['sum_time'] / stats_data['n_times']
+                stats_data['etr'] = avg_time * counters[Status.QUEUED]
         
         # --- CORRECTED LIVE AUTO-SCROLL & FLICKER-FREE DRAWING ---
         max_list_lines = height - 2
-        new_offset = current_index - (max_list_lines // 2)
+        focus_index = batch[0] if batch else current_index
+        new_offset = focus_index - (max_list_lines // 2)
         max_scroll = max(0, len(packages) - max_list_lines)
-        scroll_offset = max(0, min(new_offset, max_scroll))
-
-        if needs_redraw or process is not None:
-            pad_width = width - split_pos - 4
-            line_buffer = [wrapped for line in output_lines for wrapped in textwrap.wrap(line, pad_width if pad_width > 0 else 10)]
-
-            if len(line_buffer) > height - 3:
+        new_offset = max(0, min(new_offset, max_scroll))
+        if new_offset != scroll_offset:
+            scroll_offset = new_offset
+            dirty['left'] = True
+
+        if not too_small and any(dirty.values()):
+            stdscr.noutrefresh()
+            if dirty['left']:
+                draw_package_list(left_pane, packages, scroll_offset, height, split_pos)
+            if dirty['right']:
                 right_scroll_pos = max(0, len(line_buffer) - (height - 3))
-
-            stdscr.noutrefresh() 
-            draw_package_list(left_pane, packages, scroll_offset)
-            draw_right_pane(right_pad, height, width, line_buffer, right_scroll_pos)
-            if show_stats: draw_stats_window(stats_data)
-            if show_help: draw_help_window(help_win)
+                draw_right_pane(right_pad, height, width, line_buffer, right_scroll_pos)
+
+            # Overlays sit on top of the panes, so re-copy them whenever something beneath was repainted.
+            if show_stats:
+                if dirty['stats']:
+                    draw_stats_window(stats_data)
+                    last_stats_draw = now
+                elif dirty['right']:
+                    stats_win.touchwin(); stats_win.noutrefresh()
+            if show_help:
+                if dirty['help']: draw_help_window(help_win)
+                else: help_win.touchwin(); help_win.noutrefresh()
             curses.doupdate()
-        
-        time.sleep(0.02)
+            dirty = dict.fromkeys(dirty, False)
+
+    sel.close()
 
     # --- End of Script ---
     final_message = "Installation run complete. Press 'q' to exit."
     status_bar = curses.newwin(1, width, height - 1, 0)
     status_bar.bkgd(' ', curses.color_pair(COLOR_SUCCESS))
     # *** THIS IS THE FIX: Pad to width - 1 to avoid writing to the bottom-right corner ***
-    status_bar.addstr(0, 0, final_message.ljust(width - 1))
+    status_bar.addstr(0, 0, final_message[:width - 1].ljust(width - 1))
     status_bar.refresh()
     stdscr.nodelay(False)
     while stdscr.getch() != ord('q'): pass
@@ -311,5 +521,7 @@ if __name__ == "__main__":
         print(f"Error: Master list '{MASTER_LIST}' not found.", file=sys.stderr)
         sys.exit(1)
 
-    curses.wrapper(main_ui)
+    # Results are appended line by line as they happen, so an interrupted run can resume.
+    with open(SUCCESS_LOG, 'a', buffering=1) as success_log, open(FAILURE_LOG, 'a', buffering=1) as failure_log:
+        curses.wrapper(main_ui, success_log, failure_log)
 